@@ -1,10 +1,32 @@
 from django.contrib import admin
-from .models import AcademicYear, Trimestre, Periodo, GradeLevel, Paralelo, Subject
+from .models import AcademicYear, Trimestre, Periodo, GradeLevel, Paralelo, Subject, TeacherAssignment
 # Register your models here.
 
 admin.site.register(AcademicYear)
-admin.site.register(Trimestre)
-admin.site.register(Periodo)
 admin.site.register(GradeLevel)
 admin.site.register(Paralelo)
-admin.site.register(Subject)
\ No newline at end of file
+admin.site.register(Subject)
+
+
+# __str__ of these models follows FKs, so join them up front instead of one query per row
+
+
+@admin.register(Trimestre)
+class TrimestreAdmin(admin.ModelAdmin):
+    list_display = ('name', 'academic_year', 'start_date', 'end_date')
+    list_select_related = ('academic_year',)
+    search_fields = ('name',)
+
+
+@admin.register(Periodo)
+class PeriodoAdmin(admin.ModelAdmin):
+    list_display = ('name', 'trimestre', 'start_date', 'end_date')
+    list_select_related = ('trimestre__academic_year',)
+    search_fields = ('name',)
+
+
+@admin.register(TeacherAssignment)
+class TeacherAssignmentAdmin(admin.ModelAdmin):
+    list_display = ('teacher', 'subject', 'grade_level', 'paralelo', 'academic_year')
+    list_select_related = ('teacher', 'academic_year', 'grade_level', 'paralelo', 'subject')
+    search_fields = ('teacher__full_name', 'subject__name')
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-15 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='academicyear',
+            name='is_active',
+            field=models.BooleanField(db_index=True, default=True, verbose_name='Activo'),
+        ),
+    ]
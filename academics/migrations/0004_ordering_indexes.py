@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-15 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0003_academicyear_single_active'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gradelevel',
+            index=models.Index(fields=['order', 'code'], name='gradelevel_order_code_idx'),
+        ),
+    ]
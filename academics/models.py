@@ -1,4 +1,5 @@
 # academics/models.py
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -7,11 +8,25 @@ class AcademicYear(models.Model):
     year = models.PositiveSmallIntegerField(unique=True, verbose_name=_("Año")) # e.g., 2025
     start_date = models.DateField(verbose_name=_("Fecha de Inicio"))
     end_date = models.DateField(verbose_name=_("Fecha de Fin"))
-    is_active = models.BooleanField(default=True, verbose_name=_("Activo")) # Maybe only one is active
+    is_active = models.BooleanField(default=True, db_index=True, verbose_name=_("Activo")) # Only one may be active
 
     def __str__(self):
         return str(self.year)
 
+    def _check_single_active(self):
+        # MySQL has no partial indexes, so the single active year is enforced here
+        if self.is_active and AcademicYear.objects.filter(is_active=True).exclude(pk=self.pk).exists():
+            raise ValidationError({'is_active': _("Ya existe otro año académico activo. Desactívelo primero.")})
+
+    def clean(self):
+        super().clean()
+        self._check_single_active()
+
+    def save(self, *args, **kwargs):
+        # Same rule as clean(), so code paths that skip form validation can't activate a second year
+        self._check_single_active()
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-year']
         verbose_name = _("Año Académico")
@@ -87,6 +102,10 @@ class GradeLevel(models.Model):
     class Meta:
         # Update ordering to use the new 'order' field primarily
         ordering = ['order', 'code']
+        indexes = [
+            # Lets the default ORDER BY order, code read the index instead of sorting
+            models.Index(fields=['order', 'code'], name='gradelevel_order_code_idx'),
+        ]
         verbose_name = _("Grado")
         verbose_name_plural = _("Grados")
 
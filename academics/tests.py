@@ -1,3 +1,35 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-# Create your tests here.
+from .models import AcademicYear
+
+
+class SingleActiveAcademicYearTests(TestCase):
+    def create_year(self, year, **fields):
+        return AcademicYear.objects.create(year=year, start_date=date(year, 1, 6), end_date=date(year, 12, 19), **fields)
+
+    def setUp(self):
+        self.current = self.create_year(2025)
+
+    def test_second_active_year_is_refused(self):
+        with self.assertRaises(ValidationError):
+            self.create_year(2026)
+        self.current.refresh_from_db()
+        self.assertTrue(self.current.is_active)
+        self.assertFalse(AcademicYear.objects.filter(year=2026).exists())
+
+    def test_clean_applies_the_same_rule(self):
+        with self.assertRaises(ValidationError) as raised:
+            AcademicYear(year=2026, start_date=date(2026, 1, 5), end_date=date(2026, 12, 18)).full_clean()
+        self.assertIn('is_active', raised.exception.message_dict)
+
+    def test_inactive_years_and_switching(self):
+        upcoming = self.create_year(2026, is_active=False)
+        self.current.save() # Re-saving the active year is fine
+        self.current.is_active = False
+        self.current.save()
+        upcoming.is_active = True
+        upcoming.save()
+        self.assertEqual(AcademicYear.objects.get(is_active=True), upcoming)
@@ -1,7 +1,37 @@
+from django import forms
 from django.contrib import admin
-from .models import AcademicObjective, SGCObjective, Month, KPI
+from django.utils.translation import gettext_lazy as _
+from .models import MONTH_CHOICES, AcademicObjective, SGCObjective, KPI
+
+
+class KPIAdminForm(forms.ModelForm):
+    """Edits KPI.review_months_mask as a set of month checkboxes."""
+    review_months = forms.TypedMultipleChoiceField(
+        choices=MONTH_CHOICES,
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        label=_("Meses de Revisión"),
+        help_text=_("Seleccione los meses en que este KPI debe ser revisado/reportado."),
+    )
+
+    class Meta:
+        model = KPI
+        exclude = ('review_months_mask',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.initial.setdefault('review_months', sorted(self.instance.review_months_set))
+
+    def save(self, commit=True):
+        self.instance.review_months_set = self.cleaned_data['review_months']
+        return super().save(commit=commit)
+
+
+@admin.register(KPI)
+class KPIAdmin(admin.ModelAdmin):
+    form = KPIAdminForm
+
 
 admin.site.register(AcademicObjective)
 admin.site.register(SGCObjective)
-admin.site.register(Month)
-admin.site.register(KPI)
\ No newline at end of file
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def populate_months(apps, schema_editor):
+    """Creates the 12 Month rows (1=Enero ... 12=Diciembre) in a single INSERT."""
+    Month = apps.get_model('kpi_list', 'Month')
+    Month.objects.bulk_create([Month(number=number) for number in range(1, 13)], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kpi_list', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_months, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-15 18:02
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def review_months_to_mask(apps, schema_editor):
+    """Folds each KPI's review_months rows into the review_months_mask bitmask."""
+    KPI = apps.get_model('kpi_list', 'KPI')
+    Through = KPI.review_months.through
+    masks = defaultdict(int)
+    for kpi_id, month_number in Through.objects.values_list('kpi_id', 'month_id'):
+        masks[kpi_id] |= 1 << (month_number - 1)
+    kpis = list(KPI.objects.filter(pk__in=masks))
+    for kpi in kpis:
+        kpi.review_months_mask = masks[kpi.pk]
+    KPI.objects.bulk_update(kpis, ['review_months_mask'])
+
+
+def mask_to_review_months(apps, schema_editor):
+    """Expands review_months_mask back into review_months rows."""
+    KPI = apps.get_model('kpi_list', 'KPI')
+    Through = KPI.review_months.through
+    Through.objects.bulk_create([
+        Through(kpi_id=kpi_id, month_id=number)
+        for kpi_id, mask in KPI.objects.exclude(review_months_mask=0).values_list('pk', 'review_months_mask')
+        for number in range(1, 13)
+        if mask & (1 << (number - 1))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kpi_list', '0001_initial_squashed_0002_populate_months'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kpi',
+            name='review_months_mask',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Seleccione los meses en que este KPI debe ser revisado/reportado.', verbose_name='Meses de Revisión'),
+        ),
+        migrations.RunPython(review_months_to_mask, reverse_code=mask_to_review_months),
+        migrations.RemoveField(
+            model_name='kpi',
+            name='review_months',
+        ),
+    ]
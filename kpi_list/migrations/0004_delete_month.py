@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-15 18:25
+
+from django.db import migrations
+
+
+def repopulate_months(apps, schema_editor):
+    """Recreates the 12 Month rows so reversing 0003 can rebuild review_months."""
+    Month = apps.get_model('kpi_list', 'Month')
+    Month.objects.bulk_create([Month(number=number) for number in range(1, 13)], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kpi_list', '0003_kpi_review_months_mask'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reverse_code=repopulate_months),
+        migrations.DeleteModel(
+            name='Month',
+        ),
+    ]
@@ -1,29 +1,16 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _ # For potential translation later
 
-class Month(models.Model):
-    """Representa un mes calendario para propósitos de programación."""
-    SPANISH_MONTH_CHOICES = [
-        (1, _('Enero')), (2, _('Febrero')), (3, _('Marzo')), (4, _('Abril')),
-        (5, _('Mayo')), (6, _('Junio')), (7, _('Julio')), (8, _('Agosto')),
-        (9, _('Septiembre')), (10, _('Octubre')), (11, _('Noviembre')), (12, _('Diciembre')),
-    ]
-    number = models.PositiveSmallIntegerField(
-        primary_key=True,
-        choices=SPANISH_MONTH_CHOICES,
-        verbose_name=_("Número de Mes"),
-        help_text=_("Mes (1=Enero, 12=Diciembre)")
-    )
+MONTH_CHOICES = [
+    (1, _('Enero')), (2, _('Febrero')), (3, _('Marzo')), (4, _('Abril')),
+    (5, _('Mayo')), (6, _('Junio')), (7, _('Julio')), (8, _('Agosto')),
+    (9, _('Septiembre')), (10, _('Octubre')), (11, _('Noviembre')), (12, _('Diciembre')),
+]
 
-    def __str__(self):
-        # Get the display name from choices
-        return self.get_number_display()
 
-    class Meta:
-        ordering = ['number']
-        verbose_name = _("Mes")
-        verbose_name_plural = _("Meses")
-        # Consider adding a data migration to auto-populate months 1-12
+def month_bit(number):
+    """Bit for month `number` (1=Enero ... 12=Diciembre) in KPI.review_months_mask."""
+    return 1 << (number - 1)
 
 
 class AcademicObjective(models.Model):
@@ -54,6 +41,14 @@ class SGCObjective(models.Model):
         verbose_name_plural = _("Objetivos SGC")
 
 
+class KPIQuerySet(models.QuerySet):
+    def due_in_month(self, number):
+        """KPIs scheduled for review in month `number` (1-12); a bitwise test, no JOIN."""
+        return self.alias(
+            review_month_bit=models.F('review_months_mask').bitand(month_bit(number))
+        ).filter(review_month_bit__gt=0)
+
+
 class KPI(models.Model):
     """Representa un Indicador Clave de Desempeño (KPI) para la institución."""
     number = models.PositiveIntegerField(
@@ -92,13 +87,15 @@ class KPI(models.Model):
     )
 
     # --- Review Schedule ---
-    review_months = models.ManyToManyField(
-        Month,
-        blank=True, # Allow KPI to have no specific review months selected
+    # Bitmask over the 12 months (bit 0 = Enero ... bit 11 = Diciembre); 0 means no review months
+    review_months_mask = models.PositiveSmallIntegerField(
+        default=0,
         verbose_name=_("Meses de Revisión"),
         help_text=_("Seleccione los meses en que este KPI debe ser revisado/reportado.")
     )
 
+    objects = KPIQuerySet.as_manager()
+
     # --- Potential Future Fields ---
     # data_source_type = models.CharField(...)
     # calculation_logic = models.TextField(...)
@@ -107,6 +104,18 @@ class KPI(models.Model):
     def __str__(self):
         return f"KPI {self.number}: {self.name}"
 
+    @property
+    def review_months_set(self):
+        """Month numbers (1-12) in which this KPI is reviewed."""
+        return {number for number in range(1, 13) if self.review_months_mask & month_bit(number)}
+
+    @review_months_set.setter
+    def review_months_set(self, numbers):
+        mask = 0
+        for number in numbers:
+            mask |= month_bit(int(number))
+        self.review_months_mask = mask
+
     class Meta:
         ordering = ['number'] # Default sort order
         verbose_name = "KPI"
@@ -1,3 +1,91 @@
-from django.test import TestCase
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
 
-# Create your tests here.
+from .admin import KPIAdminForm
+from .models import KPI
+
+
+def month_mask(*numbers):
+    return sum(1 << (number - 1) for number in numbers)
+
+
+class ReviewMonthsMaskTests(TestCase):
+    def create_kpi(self, number, months=()):
+        kpi = KPI(number=number, name=f'KPI {number}')
+        kpi.review_months_set = months
+        kpi.save()
+        return kpi
+
+    def test_review_months_set_round_trip(self):
+        kpi = KPI(number=1, name='Asistencia')
+        self.assertEqual(kpi.review_months_set, set())
+        kpi.review_months_set = ['3', 1, 12] # Form data may arrive as strings
+        self.assertEqual(kpi.review_months_mask, month_mask(1, 3, 12))
+        self.assertEqual(kpi.review_months_set, {1, 3, 12})
+        kpi.review_months_set = []
+        self.assertEqual(kpi.review_months_mask, 0)
+
+    def test_due_in_month(self):
+        january = self.create_kpi(1, [1])
+        december = self.create_kpi(2, [12])
+        both = self.create_kpi(3, [1, 6, 12])
+        self.create_kpi(4)
+        self.assertQuerySetEqual(KPI.objects.due_in_month(1), [january, both])
+        self.assertQuerySetEqual(KPI.objects.due_in_month(6), [both])
+        self.assertQuerySetEqual(KPI.objects.due_in_month(12), [december, both])
+        self.assertQuerySetEqual(KPI.objects.due_in_month(2), [])
+
+    def test_admin_form_initial_and_save(self):
+        kpi = self.create_kpi(1, [2, 11])
+        self.assertEqual(KPIAdminForm(instance=kpi).initial['review_months'], [2, 11])
+
+        form = KPIAdminForm({'number': 1, 'name': 'KPI 1', 'review_months': ['1', '12']}, instance=kpi)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        kpi.refresh_from_db()
+        self.assertEqual(kpi.review_months_mask, month_mask(1, 12))
+
+        form = KPIAdminForm({'number': 1, 'name': 'KPI 1'}, instance=kpi)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        kpi.refresh_from_db()
+        self.assertEqual(kpi.review_months_mask, 0)
+
+
+class ReviewMonthsMaskMigrationTests(TransactionTestCase):
+    """0003 folds the review_months M2M rows into review_months_mask, and its reverse expands them again."""
+
+    before = [('kpi_list', '0001_initial_squashed_0002_populate_months')]
+    after = [('kpi_list', '0003_kpi_review_months_mask')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes('kpi_list'))
+
+    def test_forward_and_reverse(self):
+        apps = self.migrate(self.before)
+        OldKPI = apps.get_model('kpi_list', 'KPI')
+        months = {month.number: month for month in apps.get_model('kpi_list', 'Month').objects.all()}
+        edges = OldKPI.objects.create(number=1, name='Enero y Diciembre')
+        edges.review_months.set([months[1], months[12]])
+        middle = OldKPI.objects.create(number=2, name='Junio')
+        middle.review_months.set([months[6]])
+        none = OldKPI.objects.create(number=3, name='Sin revisión')
+
+        apps = self.migrate(self.after)
+        masks = dict(apps.get_model('kpi_list', 'KPI').objects.values_list('pk', 'review_months_mask'))
+        self.assertEqual(masks, {edges.pk: month_mask(1, 12), middle.pk: month_mask(6), none.pk: 0})
+
+        apps = self.migrate(self.before)
+        OldKPI = apps.get_model('kpi_list', 'KPI')
+        review_months = {
+            kpi.pk: sorted(kpi.review_months.values_list('number', flat=True))
+            for kpi in OldKPI.objects.all()
+        }
+        self.assertEqual(review_months, {edges.pk: [1, 12], middle.pk: [6], none.pk: []})
@@ -2,5 +2,39 @@ from django.contrib import admin
 from .models import Teacher, PeriodProgress, TopicCompletion
 
 admin.site.register(Teacher)
-admin.site.register(PeriodProgress)
-admin.site.register(TopicCompletion)
\ No newline at end of file
+
+
+# The default managers already join the FKs used by __str__. ChangeList ignores
+# list_select_related once a queryset has select_related, so the extra join for
+# Periodo.__str__ (trimestre__academic_year) is added in get_queryset instead
+
+
+class ProgressRecordAdmin(admin.ModelAdmin):
+    """
+    Base for the progress-record admins. Deleting records forgets the teacher's
+    synced sheet revision, so the next update_progress_data run re-reads the
+    sheet and restores them instead of skipping it as unchanged.
+    """
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('periodo__trimestre__academic_year')
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Teacher.objects.filter(pk=obj.teacher_id).update(last_sheet_revision=None)
+
+    def delete_queryset(self, request, queryset):
+        teacher_ids = list(queryset.order_by().values_list('teacher_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        Teacher.objects.filter(pk__in=teacher_ids).update(last_sheet_revision=None)
+
+
+@admin.register(PeriodProgress)
+class PeriodProgressAdmin(ProgressRecordAdmin):
+    list_display = ('teacher', 'grade_level', 'periodo', 'paralelo', 'progress_percentage', 'academic_year', 'last_updated')
+    search_fields = ('teacher__full_name',)
+
+
+@admin.register(TopicCompletion)
+class TopicCompletionAdmin(ProgressRecordAdmin):
+    list_display = ('teacher', 'grade_level', 'periodo', 'paralelo', 'tema_number', 'completion_date', 'academic_year')
+    search_fields = ('teacher__full_name', 'tema_title')
@@ -1,119 +1,252 @@
 # teachers/management/commands/update_progress_data.py
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import MemoryHandler
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from teachers.models import Teacher, PeriodProgress, TopicCompletion
-from academics.models import AcademicYear, GradeLevel, Periodo, Paralelo
-from teachers.utils import get_pygsheets_client, find_valid_teacher_worksheets, extract_worksheet_data, extract_sheet_key_from_url
+from academics.models import AcademicYear
+from teachers.utils import (
+    get_pygsheets_client, find_valid_teacher_worksheets, extract_worksheets_data, extract_sheet_key_from_url,
+    bulk_upsert_period_progress, bulk_upsert_topic_completion, load_lookup_maps, drop_unchanged, resolve_records,
+    PERIOD_PROGRESS_UNIQUE_FIELDS, TOPIC_COMPLETION_UNIQUE_FIELDS,
+    PERIOD_PROGRESS_VALUE_FIELDS, TOPIC_COMPLETION_VALUE_FIELDS,
+)
 from django.conf import settings
 
 
 SERVICE_ACCOUNT_FILE = settings.SERVICE_ACCOUNT_FILE  # Ensure this is set in your settings.py
 
+logger = logging.getLogger(__name__)
+
+# Progress messages are buffered and written in blocks of this many records
+LOG_BUFFER_CAPACITY = 1000
+# Sheet fetches are network-bound, so threads overlap the Google API round-trips
+MAX_FETCH_WORKERS = 12
+
+
 class Command(BaseCommand):
     help = 'Fetches progress data from teacher Google Sheets and updates the database.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-read every sheet, even those unchanged since the last sync.',
+        )
+
     def handle(self, *args, **options):
-        self.stdout.write("Starting data update process...")
-        active_teachers = Teacher.objects.filter(is_active=True)
+        # Restored afterwards so call_command() leaves the module logger as it found it
+        saved_level, saved_propagate = logger.level, logger.propagate
+        handlers = self.configure_logging(options['verbosity'])
+        try:
+            self.update_progress(force=options['force'])
+        finally:
+            # MemoryHandler.close() flushes whatever is still buffered
+            for handler in handlers:
+                handler.close()
+                logger.removeHandler(handler)
+            logger.setLevel(saved_level)
+            logger.propagate = saved_propagate
+
+    def configure_logging(self, verbosity):
+        """
+        Routes the module logger to this command's streams and returns the
+        attached handlers. Info records are buffered in a MemoryHandler and
+        written to stdout in blocks; an error flushes the buffer and is
+        written to stderr.
+        """
+        stdout_handler = logging.StreamHandler(self.stdout)
+        stdout_handler.addFilter(lambda record: record.levelno < logging.ERROR)
+        buffered_handler = MemoryHandler(LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=stdout_handler)
+        stderr_handler = logging.StreamHandler(self.stderr)
+        stderr_handler.setLevel(logging.ERROR)
+
+        logger.setLevel(logging.INFO if verbosity >= 1 else logging.ERROR)
+        logger.propagate = False
+        handlers = [buffered_handler, stderr_handler]
+        for handler in handlers:
+            logger.addHandler(handler)
+        return handlers
+
+    def update_progress(self, force=False):
+        logger.info("Starting data update process...")
         # Assuming you want to process for the currently active academic year
         try:
              # You might need a way to determine the 'current' year or pass it as an argument
              current_academic_year = AcademicYear.objects.get(is_active=True)
         except AcademicYear.DoesNotExist:
-             self.stderr.write(self.style.ERROR("No active AcademicYear found. Cannot proceed."))
+             logger.error("No active AcademicYear found. Cannot proceed.")
              return
         except AcademicYear.MultipleObjectsReturned:
-             self.stderr.write(self.style.ERROR("Multiple active AcademicYears found. Define only one."))
+             logger.error("Multiple active AcademicYears found. Define only one.")
              return
 
 
-        # Pre-fetch lookup objects for efficiency if feasible, or fetch as needed
-        # grade_levels = {g.code: g for g in GradeLevel.objects.all()}
-        # periodos = {p.number: p for p in Periodo.objects.filter(trimestre__academic_year=current_academic_year)}
-        # paralelos = {p.code: p for p in Paralelo.objects.all()}
-
-        gc = get_pygsheets_client(SERVICE_ACCOUNT_FILE) # Authorize once
+        # Only the fields the workers read. Materialized up front: executor.map submits every
+        # teacher immediately, so a lazy iterator would be drained before any result arrives anyway
+        active_teachers = list(
+            Teacher.objects.filter(is_active=True)
+            .only('id', 'full_name', 'google_sheet_url', 'last_sheet_revision', 'last_sync_academic_year')
+        )
+
+        # Pre-fetch lookup keys once; these tables don't change during the run
+        lookups = load_lookup_maps(current_academic_year)
+
+        # One timestamp for the whole run, so every row written by it shares the same last_updated
+        now = timezone.now()
+
+        # Fetch and parse sheets concurrently; workers only build unsaved instances
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            teacher_results = executor.map(
+                lambda teacher: self.process_teacher(teacher, current_academic_year, lookups, now, force),
+                active_teachers,
+            )
+            synced_teachers = []
+            # Django DB connections are per-thread, so all writes happen here on the main thread,
+            # one transaction per teacher as each result arrives
+            for teacher, period_progress_objs, topic_completion_objs, revision, messages in teacher_results:
+                for level, message in messages:
+                    logger.log(level, message)
+                try:
+                    with transaction.atomic():
+                        # Rows identical to what is stored are left alone, so last_updated
+                        # marks the last run in which the sheet value actually changed
+                        bulk_upsert_period_progress(drop_unchanged(
+                            PeriodProgress, period_progress_objs, PERIOD_PROGRESS_UNIQUE_FIELDS, PERIOD_PROGRESS_VALUE_FIELDS,
+                        ))
+                        bulk_upsert_topic_completion(drop_unchanged(
+                            TopicCompletion, topic_completion_objs, TOPIC_COMPLETION_UNIQUE_FIELDS, TOPIC_COMPLETION_VALUE_FIELDS,
+                        ))
+                except Exception as db_e:
+                     logger.error(f"DB Error saving records for teacher {teacher.full_name}: {db_e}")
+                     continue
+
+                if revision is not None:
+                    teacher.last_sheet_revision = revision
+                    teacher.last_sync_academic_year = current_academic_year
+                    teacher.last_sync_at = now
+                    synced_teachers.append(teacher)
+
+        # Remember which sheet revisions are stored, and for which year, so the next run can skip them
+        Teacher.objects.bulk_update(synced_teachers, ['last_sheet_revision', 'last_sync_academic_year', 'last_sync_at'])
+
+        logger.info("Data update process finished.")
+
+    def process_teacher(self, teacher, current_academic_year, lookups, now, force=False):
+        """
+        Reads one teacher's spreadsheet and returns a tuple of
+        (teacher, unsaved PeriodProgress list, unsaved TopicCompletion list, revision, messages).
+        `revision` is the sheet's Drive modifiedTime when every worksheet was read
+        cleanly, and None if the sheet was skipped, its modifiedTime could not be
+        read, or anything failed, so only complete syncs are remembered. Unless
+        `force` is set, a sheet whose modifiedTime matches teacher.last_sheet_revision
+        is skipped, provided that revision was synced into `current_academic_year`.
+        `messages` holds this teacher's (level, message) log lines; they are logged
+        together when the result is consumed, so concurrent teachers don't interleave.
+        Runs in a worker thread, so it must not touch the database.
+        """
+        period_progress_objs = []
+        topic_completion_objs = []
+        skipped = Counter() # (field, value) -> number of records dropped for an unknown lookup or unstorable value
+        messages = [] # (level, message) pairs, logged by update_progress() on the main thread
+        revision = None
+        complete = True
+
+        messages.append((logging.INFO, f"Processing teacher: {teacher.full_name}..."))
+        try:
+            gc = get_pygsheets_client(SERVICE_ACCOUNT_FILE) # Authorized once per worker thread, then cached
+            sheet_key = extract_sheet_key_from_url(teacher.google_sheet_url)
+            if not sheet_key:
+                raise ValueError(f"Could not extract valid sheet key from URL: {teacher.google_sheet_url}")
 
-        for teacher in active_teachers:
-            self.stdout.write(f"Processing teacher: {teacher.full_name}...")
+            # A single Drive metadata call; skips opening the sheet at all when nothing changed
             try:
-                # 1. Find valid worksheets
-                valid_titles = find_valid_teacher_worksheets(
-                    teacher.google_sheet_url, SERVICE_ACCOUNT_FILE # Pass client 'gc' instead? Refactor needed.
-                )
-                if not valid_titles:
-                    self.stdout.write(f"  No valid worksheets found for {teacher.full_name}.")
-                    continue
-
-                sh = gc.open_by_key(extract_sheet_key_from_url(teacher.google_sheet_url)) # Need key extraction here too
-
-                # 2. Extract data from each valid worksheet
-                for title in valid_titles:
-                    self.stdout.write(f"  Processing worksheet: {title}...")
-                    try:
-                        wks = sh.worksheet_by_title(title)
-                        extracted_data = extract_worksheet_data(wks)
-
-                        # 3. Update/Create database records using extracted data
-                        now = timezone.now()
-
-                        # Process Period Progress
-                        for record in extracted_data.get('period_progress', []):
-                            try:
-                                # Fetch related objects (can be optimized)
-                                grade_level_obj = GradeLevel.objects.get(code=record['grade_level'])
-                                periodo_obj = Periodo.objects.get(trimestre__academic_year=current_academic_year, number=record['periodo'])
-                                paralelo_obj = Paralelo.objects.get(code=record['paralelo'])
-
-                                PeriodProgress.objects.update_or_create(
-                                    teacher=teacher,
-                                    academic_year=current_academic_year,
-                                    grade_level=grade_level_obj,
-                                    periodo=periodo_obj,
-                                    paralelo=paralelo_obj,
-                                    defaults={
-                                        'progress_percentage': record['progress_percentage'],
-                                        'last_updated': now
-                                    }
-                                )
-                            except (GradeLevel.DoesNotExist, Periodo.DoesNotExist, Paralelo.DoesNotExist) as lookup_e:
-                                 self.stderr.write(self.style.ERROR(f"    Lookup Error for Period Progress ({record}): {lookup_e}"))
-                            except Exception as db_e:
-                                 self.stderr.write(self.style.ERROR(f"    DB Error saving Period Progress ({record}): {db_e}"))
-
-
-                        # Process Topic Completion
-                        for record in extracted_data.get('topic_completion', []):
-                            try:
-                                grade_level_obj = GradeLevel.objects.get(code=record['grade_level'])
-                                periodo_obj = Periodo.objects.get(trimestre__academic_year=current_academic_year, number=record['periodo'])
-                                paralelo_obj = Paralelo.objects.get(code=record['paralelo'])
-                                # Subject lookup if you add it
-
-                                TopicCompletion.objects.update_or_create(
-                                    teacher=teacher,
-                                    academic_year=current_academic_year,
-                                    grade_level=grade_level_obj,
-                                    periodo=periodo_obj,
-                                    paralelo=paralelo_obj,
-                                    tema_number=record['tema_number'],
-                                    # Uniqueness might need refinement if title changes but number stays same
-                                    # For now, assuming unique_together in model handles this
-                                    defaults={
-                                        'tema_title': record['tema_title'],
-                                        'completion_date': record['completion_date'],
-                                        'last_updated': now
-                                    }
-                                )
-                            except (GradeLevel.DoesNotExist, Periodo.DoesNotExist, Paralelo.DoesNotExist) as lookup_e:
-                                 self.stderr.write(self.style.ERROR(f"    Lookup Error for Topic Completion ({record}): {lookup_e}"))
-                            except Exception as db_e:
-                                 self.stderr.write(self.style.ERROR(f"    DB Error saving Topic Completion ({record}): {db_e}"))
-
-                    except Exception as e:
-                        self.stderr.write(self.style.ERROR(f"  Failed processing worksheet '{title}' for teacher {teacher.full_name}: {e}"))
-
+                revision = gc.drive.get_update_time(sheet_key)
             except Exception as e:
-                 self.stderr.write(self.style.ERROR(f"Failed processing teacher {teacher.full_name}: {e}"))
-
-        self.stdout.write(self.style.SUCCESS("Data update process finished."))
+                # Only an optimization (and the Drive API may not be enabled): read the sheet in
+                # full, and remember no revision for it
+                messages.append((logging.WARNING, f"  Could not read the sheet revision for {teacher.full_name}, reading it in full: {e}"))
+                revision = None
+            # A new active year has none of the sheet's rows yet, so the revision only counts for its own year
+            if not force and revision is not None and (revision, current_academic_year.pk) == (
+                teacher.last_sheet_revision, teacher.last_sync_academic_year_id
+            ):
+                messages.append((logging.INFO, f"  Sheet of {teacher.full_name} unchanged since last sync ({revision}), skipping."))
+                return teacher, period_progress_objs, topic_completion_objs, None, messages
+
+            sh = gc.open_by_key(sheet_key) # Opened once, reused for validation and extraction
+
+            # 1. Find valid worksheets
+            valid_titles = find_valid_teacher_worksheets(sh)
+            if not valid_titles:
+                messages.append((logging.INFO, f"  No valid worksheets found for {teacher.full_name}."))
+                return teacher, period_progress_objs, topic_completion_objs, revision, messages
+
+            # 2. Read every valid worksheet in one batchGet request, then parse each locally
+            worksheets_data = extract_worksheets_data(sh, valid_titles)
+            for title, extracted_data in worksheets_data.items():
+                messages.append((logging.INFO, f"  Processing worksheet: {title} of {teacher.full_name}..."))
+                try:
+                    # 3. Build unsaved records; they are upserted in batches by update_progress()
+                    # Keyed by the unique fields so a row repeated in the sheet is written once (last wins)
+                    period_progress_buffer = {}
+                    topic_completion_buffer = {}
+                    resolved_cache = {}
+
+                    # Process Period Progress
+                    for record, (grade_level_id, periodo_id, paralelo_id) in resolve_records(
+                        extracted_data.get('period_progress', []), lookups, skipped, resolved_cache
+                    ):
+                        key = (record.grade_level, record.periodo, record.paralelo)
+                        period_progress_buffer[key] = PeriodProgress(
+                            teacher=teacher,
+                            academic_year=current_academic_year,
+                            grade_level_id=grade_level_id,
+                            periodo_id=periodo_id,
+                            paralelo_id=paralelo_id,
+                            progress_percentage=record.progress_percentage,
+                            last_updated=now,
+                        )
+
+                    # Process Topic Completion
+                    for record, (grade_level_id, periodo_id, paralelo_id) in resolve_records(
+                        extracted_data.get('topic_completion', []), lookups, skipped, resolved_cache
+                    ):
+                        # Subject lookup if you add it
+                        # Uniqueness might need refinement if title changes but number stays same
+                        # For now, assuming the model's unique constraint handles this
+                        key = (record.grade_level, record.periodo, record.paralelo, record.tema_number)
+                        topic_completion_buffer[key] = TopicCompletion(
+                            teacher=teacher,
+                            academic_year=current_academic_year,
+                            grade_level_id=grade_level_id,
+                            periodo_id=periodo_id,
+                            paralelo_id=paralelo_id,
+                            tema_number=record.tema_number,
+                            tema_title=record.tema_title,
+                            completion_date=record.completion_date,
+                            last_updated=now,
+                        )
+
+                    period_progress_objs.extend(period_progress_buffer.values())
+                    topic_completion_objs.extend(topic_completion_buffer.values())
+
+                except Exception as e:
+                    complete = False
+                    messages.append((logging.ERROR, f"  Failed processing worksheet '{title}' for teacher {teacher.full_name}: {e}"))
+
+        except Exception as e:
+             complete = False
+             messages.append((logging.ERROR, f"Failed processing teacher {teacher.full_name}: {e}"))
+
+        if skipped:
+            # Retry next run even if the sheet is untouched, in case the lookup tables get fixed
+            complete = False
+            misses = ', '.join(f"{field}={value!r} ({count})" for (field, value), count in skipped.most_common())
+            messages.append((logging.ERROR, f"  Skipped records with unknown lookups or unstorable values for {teacher.full_name}: {misses}"))
+
+        return teacher, period_progress_objs, topic_completion_objs, revision if complete else None, messages
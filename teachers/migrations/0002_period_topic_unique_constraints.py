@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-15 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0002_initial'),
+        ('teachers', '0001_initial'),
+    ]
+
+    operations = [
+        # Add the named constraints before dropping unique_together so uniqueness is never lifted
+        migrations.AddConstraint(
+            model_name='periodprogress',
+            constraint=models.UniqueConstraint(fields=('teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo'), name='unique_period_progress'),
+        ),
+        migrations.AddConstraint(
+            model_name='topiccompletion',
+            constraint=models.UniqueConstraint(fields=('teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo', 'tema_number'), name='unique_topic_completion'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='periodprogress',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='topiccompletion',
+            unique_together=set(),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-15 17:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0002_initial'),
+        ('teachers', '0002_period_topic_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacher',
+            name='last_sheet_revision',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='last_sync_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='last_sync_academic_year',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academics.academicyear'),
+        ),
+    ]
@@ -9,6 +9,9 @@ class Teacher(models.Model):
     email = models.EmailField(unique=True, null=True, blank=True) # Allow null/blank initially
     google_sheet_url = models.URLField(unique=True, max_length=500) # Ensure length is sufficient
     is_active = models.BooleanField(default=True)
+    last_sheet_revision = models.CharField(max_length=64, null=True, blank=True) # Drive modifiedTime of the last synced sheet
+    last_sync_at = models.DateTimeField(null=True, blank=True)
+    last_sync_academic_year = models.ForeignKey(AcademicYear, on_delete=models.SET_NULL, null=True, blank=True, related_name='+') # Year last_sheet_revision was synced into
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -19,6 +22,14 @@ class Teacher(models.Model):
         ordering = ['full_name']
 
 
+class ProgressRecordManager(models.Manager):
+    """Default manager for the per-teacher progress records: joins every FK read by their __str__."""
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo', 'subject',
+        )
+
+
 class PeriodProgress(models.Model):
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='period_progress')
     academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name='period_progress') # NEW FK
@@ -29,13 +40,20 @@ class PeriodProgress(models.Model):
     progress_percentage = models.FloatField()
     last_updated = models.DateTimeField(default=timezone.now)
 
+    objects = ProgressRecordManager()
+
     def __str__(self):
          # Access related fields correctly
         return f"{self.teacher.full_name} - {self.grade_level.code} - P{self.periodo.number} - {self.paralelo.code}: {self.progress_percentage}% ({self.academic_year.year})"
 
     class Meta:
-        # Update unique_together for ForeignKeys
-        unique_together = ('teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo')
+        # Unique index over the FKs; also the conflict target for the bulk upserts in update_progress_data
+        constraints = [
+            models.UniqueConstraint(
+                fields=['teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo'],
+                name='unique_period_progress',
+            ),
+        ]
         ordering = ['teacher', 'academic_year', 'grade_level', 'periodo__number', 'paralelo'] # Order by periodo number
         verbose_name_plural = "Period Progress Records"
 
@@ -51,13 +69,19 @@ class TopicCompletion(models.Model):
     completion_date = models.DateField()
     last_updated = models.DateTimeField(default=timezone.now)
 
+    objects = ProgressRecordManager()
+
     def __str__(self):
         return f"{self.teacher.full_name} - {self.grade_level.code} - P{self.periodo.number} - {self.paralelo.code} - Tema {self.tema_number}: {self.completion_date} ({self.academic_year.year})"
 
     class Meta:
-        # Update unique_together (removing tema_title, using FKs)
-        unique_together = ('teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo', 'tema_number', 'subject') # Added subject? Maybe too strict again. Reconsider.
-        # Let's try without subject first for uniqueness, similar to previous issue
-        unique_together = ('teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo', 'tema_number')
+        # Unique index over the FKs (removing tema_title); also the conflict target for the bulk upserts
+        # Adding subject here may be too strict again, similar to previous issue. Reconsider.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo', 'tema_number'],
+                name='unique_topic_completion',
+            ),
+        ]
         ordering = ['teacher', 'academic_year', 'grade_level', 'periodo__number', 'completion_date']
         verbose_name_plural = "Topic Completion Records"
\ No newline at end of file
@@ -1,3 +1,498 @@
-from django.test import TestCase
+from collections import Counter
+from datetime import date
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase
+
+from academics.models import AcademicYear, GradeLevel, Paralelo, Periodo, Trimestre
+from .models import PeriodProgress, Teacher, TopicCompletion
+from .utils import (
+    PeriodProgressRow,
+    TopicCompletionRow,
+    WORKSHEET_DATA_COLUMNS,
+    _value_ranges_to_frame,
+    batch_get_values,
+    find_valid_teacher_worksheets,
+    parse_worksheet_frame,
+    PERIOD_PROGRESS_UNIQUE_FIELDS,
+    PERIOD_PROGRESS_VALUE_FIELDS,
+    TOPIC_COMPLETION_UNIQUE_FIELDS,
+    TOPIC_COMPLETION_VALUE_FIELDS,
+    drop_unchanged,
+    resolve_records,
+    worksheet_range,
+)
+
+
+def value_ranges(rows):
+    """
+    Builds the value matrices batchGet returns for WORKSHEET_DATA_COLUMNS from
+    `rows`, each a {column letter: value} dict. Like the API, trailing empty
+    cells and trailing empty rows are dropped, so the blocks can differ in length.
+    """
+    ranges = []
+    for first, last in WORKSHEET_DATA_COLUMNS:
+        letters = [chr(code) for code in range(ord(first), ord(last) + 1)]
+        values = []
+        for row in rows:
+            cells = [row.get(letter, '') for letter in letters]
+            while cells and cells[-1] == '':
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        ranges.append(values)
+    return ranges
+
+
+def parse(rows, grade_level='1EGB'):
+    return parse_worksheet_frame(_value_ranges_to_frame(value_ranges(rows)), grade_level)
+
+
+class ParseWorksheetFrameTests(SimpleTestCase):
+    def test_header_in_column_a(self):
+        records = parse([
+            {'A': '1ER PERIODO'},
+            {'O': '100,00%', 'P': '50,00%'},
+            {'D': '1', 'E': 'Números naturales', 'O': '06/03/25'},
+        ])
+        self.assertEqual(records['period_progress'], [
+            PeriodProgressRow('1EGB', 1, 'A', 100.0),
+            PeriodProgressRow('1EGB', 1, 'B', 50.0),
+        ])
+        self.assertEqual(records['topic_completion'], [
+            TopicCompletionRow('1EGB', 1, 'A', '1', 'Números naturales', date(2025, 3, 6)),
+        ])
+
+    def test_header_in_column_g(self):
+        records = parse([
+            {'G': ' 2do Periodo '},
+            {'R': '75,5%'},
+            {'D': '4', 'E': 'Fracciones', 'Q': '15/07/25'},
+        ])
+        self.assertEqual(records['period_progress'], [PeriodProgressRow('1EGB', 2, 'D', 75.5)])
+        self.assertEqual(records['topic_completion'], [
+            TopicCompletionRow('1EGB', 2, 'C', '4', 'Fracciones', date(2025, 7, 15)),
+        ])
+
+    def test_only_the_row_directly_under_a_header_is_progress(self):
+        records = parse([
+            {'A': '1ER PERIODO'},
+            {'E': 'Avance', 'O': '10,00%', 'P': '01/02/25'},
+            {'O': '90,00%'},
+            {'D': '1', 'E': 'Tema', 'O': '80,00%'},
+        ])
+        self.assertEqual(records['period_progress'], [PeriodProgressRow('1EGB', 1, 'A', 10.0)])
+        # The progress row is never a topic, even with a title and a date
+        self.assertEqual(records['topic_completion'], [])
+
+    def test_topic_rows_with_and_without_dates(self):
+        records = parse([
+            {'A': '1ER PERIODO'},
+            {},
+            {'D': '1', 'E': 'Sin fecha'},
+            {'D': '2', 'E': 'Con fechas', 'O': '01/04/25', 'Q': 'pendiente', 'R': '03/04/25'},
+            {'O': '05/04/25'}, # Date without a title: a description row
+            {'E': 'Sin número', 'P': '02/04/25'},
+        ])
+        self.assertEqual(records['topic_completion'], [
+            TopicCompletionRow('1EGB', 1, 'A', '2', 'Con fechas', date(2025, 4, 1)),
+            TopicCompletionRow('1EGB', 1, 'D', '2', 'Con fechas', date(2025, 4, 3)),
+            TopicCompletionRow('1EGB', 1, 'B', '', 'Sin número', date(2025, 4, 2)),
+        ])
+
+    def test_blocks_of_different_lengths(self):
+        rows = [
+            {'A': '1ER PERIODO'},
+            {'O': '20,00%'},
+            {'G': '2DO PERIODO'},
+            {'P': '30,00%'},
+            {},
+            {'D': '7', 'E': 'Último tema'},
+            {},
+            {'O': '09/09/25'},
+        ]
+        ranges = value_ranges(rows)
+        self.assertEqual([len(values) for values in ranges], [1, 6, 8])
+        records = parse(rows)
+        self.assertEqual(records['period_progress'], [
+            PeriodProgressRow('1EGB', 1, 'A', 20.0),
+            PeriodProgressRow('1EGB', 2, 'B', 30.0),
+        ])
+        self.assertEqual(records['topic_completion'], [])
+
+    def test_rows_before_the_first_header_are_ignored(self):
+        records = parse([
+            {'A': 'PLANIFICACIÓN'},
+            {'O': '100,00%'},
+            {'D': '0', 'E': 'Diagnóstico', 'O': '01/01/25'},
+            {'A': '3ER PERIODO'},
+            {'P': '40,00%'},
+        ], grade_level='2BGU')
+        self.assertEqual(records['period_progress'], [PeriodProgressRow('2BGU', 3, 'B', 40.0)])
+        self.assertEqual(records['topic_completion'], [])
+
+    def test_empty_worksheet(self):
+        self.assertEqual(parse([]), {'period_progress': [], 'topic_completion': []})
+
+
+def fake_spreadsheet(title, worksheets):
+    """
+    A stand-in for an opened pygsheets.Spreadsheet whose worksheets hold the
+    given {title: (E3 header, E4 teacher name)} cells, and a batch_get_values
+    patch serving them.
+    """
+    cells = {}
+    for worksheet_title, (header, name) in worksheets.items():
+        cells[worksheet_range(worksheet_title, 'E3')] = header
+        cells[worksheet_range(worksheet_title, 'E4')] = name
+    sh = SimpleNamespace(
+        title=title, id='sheet-key', client=None,
+        worksheets=lambda: [SimpleNamespace(title=worksheet_title) for worksheet_title in worksheets],
+    )
+    batch_get = mock.patch(
+        'teachers.utils.batch_get_values',
+        side_effect=lambda client, spreadsheet_id, ranges: [[[cells[cell]]] for cell in ranges],
+    )
+    return sh, batch_get
+
+
+class FindValidTeacherWorksheetsTests(SimpleTestCase):
+    def find(self, title, worksheets, **kwargs):
+        sh, batch_get = fake_spreadsheet(title, worksheets)
+        with batch_get:
+            return find_valid_teacher_worksheets(sh, **kwargs)
+
+    def test_header_and_name_checks(self):
+        self.assertEqual(self.find('Lic. Ana Vega_2025', {
+            '1S': ('DOCENTE', 'Vega Ana'),
+            '2S': ('docente ', 'ANA VEGA'),
+            'Notas': ('NOTAS', 'Ana Vega'),
+            '3S': ('DOCENTE', ''),
+            '4S': ('DOCENTE', 'Carlos Ortiz'),
+        }), ['1S', '2S'])
+
+    def test_non_ascii_letters_are_dropped_like_thefuzz(self):
+        # thefuzz deleted Latin-1 letters before scoring: 88 and 89, not 0 and 80
+        self.assertEqual(self.find('Ñañez Ana', {'1S': ('DOCENTE', 'Nanez Ana')}), ['1S'])
+        self.assertEqual(self.find('José Pérez', {'1S': ('DOCENTE', 'Jose Perez')}, similarity_threshold=85), ['1S'])
+
+    def test_scores_are_rounded_before_the_threshold(self):
+        # token_set_ratio scores this pair 79.55, which thefuzz rounded to 80
+        name = 'x' * 35
+        self.assertEqual(self.find(name + 'y' * 9, {'1S': ('DOCENTE', name + 'z' * 9)}), ['1S'])
+        self.assertEqual(self.find(name + 'y' * 9, {'1S': ('DOCENTE', name + 'z' * 9)}, similarity_threshold=81), [])
+
+    def test_exact_matches_skip_scoring(self):
+        with mock.patch('teachers.utils.process.cdist') as cdist:
+            self.assertEqual(self.find('Dr. Luis  Mena', {'1S': ('DOCENTE', 'luis mena.'), '2S': ('DOCENTE', 'Luis Mena')}), ['1S', '2S'])
+        cdist.assert_not_called()
+
+
+class BatchGetValuesTests(SimpleTestCase):
+    def batch_get(self, response, ranges):
+        client = mock.Mock()
+        client.sheet.service.spreadsheets().values().batchGet().execute.return_value = response
+        return batch_get_values(client, 'sheet-key', ranges)
+
+    def test_one_value_matrix_per_range(self):
+        response = {'valueRanges': [{'range': "'1S'!E3", 'values': [['DOCENTE']]}, {'range': "'1S'!E4"}]}
+        self.assertEqual(self.batch_get(response, ["'1S'!E3", "'1S'!E4"]), [[['DOCENTE']], []])
+
+    def test_missing_value_ranges_raise(self):
+        with self.assertRaises(ValueError):
+            self.batch_get({'valueRanges': [{'range': "'1S'!E3", 'values': [['DOCENTE']]}]}, ["'1S'!E3", "'1S'!E4"])
+        with self.assertRaises(ValueError):
+            self.batch_get({}, ["'1S'!E3"])
+
+
+class ProgressFixtureMixin:
+    """One active year with two periodos, two grade levels, paralelos A-B and two teachers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.year = AcademicYear.objects.create(year=2025, start_date=date(2025, 1, 6), end_date=date(2025, 12, 19))
+        trimestre = Trimestre.objects.create(academic_year=cls.year, number=1, name='1er Trimestre')
+        cls.periodo_1 = Periodo.objects.create(trimestre=trimestre, number=1, name='1er Periodo')
+        cls.periodo_2 = Periodo.objects.create(trimestre=trimestre, number=2, name='2do Periodo')
+        cls.grade_1 = GradeLevel.objects.create(code='1S', name='1ro de Secundaria', order=1)
+        cls.grade_10 = GradeLevel.objects.create(code='10S', name='10mo de Secundaria', order=10)
+        cls.paralelo_a = Paralelo.objects.create(code='A')
+        cls.paralelo_b = Paralelo.objects.create(code='B')
+        cls.teacher = Teacher.objects.create(full_name='Zoila Mena', google_sheet_url='https://docs.google.com/spreadsheets/d/key-zoila/edit')
+        cls.other_teacher = Teacher.objects.create(full_name='Ana Vega', google_sheet_url='https://docs.google.com/spreadsheets/d/key-ana/edit')
+
+    def period_progress(self, teacher=None, grade_level=None, periodo=None, paralelo=None, **fields):
+        return PeriodProgress.objects.create(
+            teacher=teacher or self.teacher, academic_year=self.year,
+            grade_level=grade_level or self.grade_1, periodo=periodo or self.periodo_1,
+            paralelo=paralelo or self.paralelo_a, **{'progress_percentage': 50.0, **fields},
+        )
+
+    def topic_completion(self, periodo=None, **fields):
+        return TopicCompletion.objects.create(
+            teacher=self.teacher, academic_year=self.year, grade_level=self.grade_1,
+            periodo=periodo or self.periodo_1, paralelo=self.paralelo_a,
+            **{'tema_number': '1', 'tema_title': 'Tema', 'completion_date': date(2025, 3, 6), **fields},
+        )
+
+
+class ProgressOrderingTests(ProgressFixtureMixin, TestCase):
+    def test_default_ordering_follows_related_models(self):
+        # Teacher name, then GradeLevel.order (not the code as text), then periodo number, then paralelo
+        expected = [
+            self.period_progress(teacher=self.other_teacher, paralelo=self.paralelo_b),
+            self.period_progress(teacher=self.other_teacher, periodo=self.periodo_2),
+            self.period_progress(),
+            self.period_progress(paralelo=self.paralelo_b),
+            self.period_progress(grade_level=self.grade_10),
+        ]
+        self.assertEqual(list(PeriodProgress.objects.all()), sorted(expected, key=lambda record: [
+            record.teacher.full_name, record.grade_level.order, record.periodo.number, record.paralelo_id,
+        ]))
+
+
+class UpdateProgressDataTests(ProgressFixtureMixin, TestCase):
+    """update_progress_data with the Google APIs faked: each sheet key maps to one worksheet's parsed records."""
+
+    def setUp(self):
+        self.sheets = {
+            'key-zoila': {
+                'period_progress': [PeriodProgressRow('1S', 1, 'A', 40.0)],
+                'topic_completion': [TopicCompletionRow('1S', 1, 'B', '1', 'Tema', date(2025, 3, 6))],
+            },
+            'key-ana': {
+                'period_progress': [PeriodProgressRow('1S', 2, 'B', 60.0)],
+                'topic_completion': [],
+            },
+        }
+        self.revisions = {'key-zoila': 'rev-1', 'key-ana': 'rev-1'}
+
+    def run_command(self, stdout=None, **options):
+        """Runs the command and returns the sheet keys it read."""
+        client = SimpleNamespace(
+            drive=SimpleNamespace(get_update_time=lambda key: self.revisions[key]),
+            open_by_key=lambda key: SimpleNamespace(key=key),
+        )
+        read = []
+
+        def extract_worksheets_data(sh, titles):
+            read.append(sh.key)
+            return {title: self.sheets[sh.key] for title in titles}
+
+        module = 'teachers.management.commands.update_progress_data'
+        with mock.patch(f'{module}.get_pygsheets_client', return_value=client), \
+                mock.patch(f'{module}.find_valid_teacher_worksheets', return_value=['1S']), \
+                mock.patch(f'{module}.extract_worksheets_data', side_effect=extract_worksheets_data):
+            call_command(
+                'update_progress_data', verbosity=0 if stdout is None else 1,
+                stdout=stdout or StringIO(), stderr=StringIO(), **options,
+            )
+        return sorted(read)
+
+    def sync_state(self, teacher):
+        teacher.refresh_from_db()
+        return teacher.last_sheet_revision, teacher.last_sync_academic_year_id
+
+    def test_unchanged_sheets_are_skipped(self):
+        self.assertEqual(self.run_command(), ['key-ana', 'key-zoila'])
+        self.assertEqual(self.sync_state(self.teacher), ('rev-1', self.year.pk))
+        self.assertEqual(PeriodProgress.objects.count(), 2)
+        self.assertEqual(TopicCompletion.objects.count(), 1)
+
+        self.revisions['key-ana'] = 'rev-2'
+        self.assertEqual(self.run_command(), ['key-ana'])
+        self.assertEqual(self.run_command(force=True), ['key-ana', 'key-zoila'])
+
+    def test_each_teachers_messages_are_logged_together(self):
+        stdout = StringIO()
+        with mock.patch('teachers.management.commands.update_progress_data.MAX_FETCH_WORKERS', 2):
+            self.run_command(stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+        for name in ('Zoila Mena', 'Ana Vega'):
+            start = lines.index(f"Processing teacher: {name}...")
+            self.assertEqual(lines[start + 1], f"  Processing worksheet: 1S of {name}...")
+
+    def test_revision_errors_do_not_block_the_sync(self):
+        self.run_command()
+        del self.revisions['key-zoila'] # get_update_time raises, like a 403 from a disabled Drive API
+        self.sheets['key-zoila']['period_progress'] = [PeriodProgressRow('1S', 1, 'A', 45.0)]
+        self.assertEqual(self.run_command(), ['key-zoila'])
+        self.assertEqual(PeriodProgress.objects.get(teacher=self.teacher).progress_percentage, 45.0)
+        # The stored revision is left as it was
+        self.assertEqual(self.sync_state(self.teacher), ('rev-1', self.year.pk))
+
+    def test_new_active_year_rereads_unchanged_sheets(self):
+        self.run_command()
+        AcademicYear.objects.filter(pk=self.year.pk).update(is_active=False)
+        next_year = AcademicYear.objects.create(year=2026, start_date=date(2026, 1, 5), end_date=date(2026, 12, 18))
+        trimestre = Trimestre.objects.create(academic_year=next_year, number=1, name='1er Trimestre')
+        for number in (1, 2):
+            Periodo.objects.create(trimestre=trimestre, number=number, name=f'{number} Periodo')
+
+        self.assertEqual(self.run_command(), ['key-ana', 'key-zoila'])
+        self.assertEqual(PeriodProgress.objects.filter(academic_year=next_year).count(), 2)
+        self.assertEqual(self.sync_state(self.teacher), ('rev-1', next_year.pk))
+
+    def test_lookup_misses_are_not_remembered(self):
+        self.sheets['key-zoila']['period_progress'].append(PeriodProgressRow('9X', 1, 'A', 10.0))
+        self.run_command()
+        # The resolvable rows are still written, but the sheet is re-read next run
+        self.assertEqual(PeriodProgress.objects.filter(teacher=self.teacher).count(), 1)
+        self.assertEqual(self.sync_state(self.teacher), (None, None))
+        self.assertEqual(self.sync_state(self.other_teacher), ('rev-1', self.year.pk))
+        self.assertEqual(self.run_command(), ['key-zoila'])
+
+    def test_unstorable_values_only_lose_their_own_records(self):
+        self.sheets['key-zoila']['topic_completion'].append(
+            TopicCompletionRow('1S', 1, 'A', 'Retroalimentación', 'Repaso', date(2025, 3, 6)),
+        )
+        self.sheets['key-zoila']['period_progress'].append(PeriodProgressRow('1S', 1, 'B', float('inf')))
+        self.run_command()
+        self.assertEqual(PeriodProgress.objects.filter(teacher=self.teacher).count(), 1)
+        self.assertEqual(list(TopicCompletion.objects.values_list('tema_number', flat=True)), ['1'])
+
+    def test_worksheet_errors_are_not_remembered(self):
+        self.sheets['key-zoila']['period_progress'].append(None) # Not a record: fails the worksheet
+        self.run_command()
+        self.assertEqual(self.sync_state(self.teacher), (None, None))
+        self.assertEqual(self.sync_state(self.other_teacher), ('rev-1', self.year.pk))
+
+    def test_failed_writes_are_not_remembered(self):
+        def bulk_upsert_topic_completion(objs):
+            if objs:
+                raise DatabaseError('lost connection')
+
+        with mock.patch(
+            'teachers.management.commands.update_progress_data.bulk_upsert_topic_completion',
+            side_effect=bulk_upsert_topic_completion,
+        ):
+            self.run_command()
+        # Zoila's transaction rolled back, progress row included; Ana has no topics to write
+        self.assertFalse(PeriodProgress.objects.filter(teacher=self.teacher).exists())
+        self.assertEqual(self.sync_state(self.teacher), (None, None))
+        self.assertEqual(self.sync_state(self.other_teacher), ('rev-1', self.year.pk))
+
+    def test_last_updated_marks_the_last_change(self):
+        self.run_command()
+        before = dict(PeriodProgress.objects.values_list('teacher__full_name', 'last_updated'))
+        self.sheets['key-ana']['period_progress'] = [PeriodProgressRow('1S', 2, 'B', 65.0)]
+        self.run_command(force=True)
+        after = dict(PeriodProgress.objects.values_list('teacher__full_name', 'last_updated'))
+        self.assertEqual(after['Zoila Mena'], before['Zoila Mena'])
+        self.assertGreater(after['Ana Vega'], before['Ana Vega'])
+        self.assertEqual(PeriodProgress.objects.get(teacher=self.other_teacher).progress_percentage, 65.0)
+
+    def test_rows_deleted_in_the_admin_are_restored(self):
+        self.run_command()
+        admin.site._registry[PeriodProgress].delete_queryset(None, PeriodProgress.objects.filter(teacher=self.teacher))
+        self.assertEqual(self.sync_state(self.teacher), (None, self.year.pk))
+        self.assertEqual(self.run_command(), ['key-zoila'])
+        self.assertTrue(PeriodProgress.objects.filter(teacher=self.teacher).exists())
+
+
+class ResolveRecordsTests(SimpleTestCase):
+    lookups = {
+        'grade_levels': {'1S': '1S'},
+        'periodos': {1: 11, 2: 12},
+        'paralelos': {'A': 'A', 'B': 'B'},
+    }
+
+    def test_resolves_foreign_keys_and_tallies_misses(self):
+        records = [
+            PeriodProgressRow('1S', 1, 'A', 10.0),
+            PeriodProgressRow('9X', 1, 'A', 20.0),
+            PeriodProgressRow('1S', 2, 'B', 30.0),
+            PeriodProgressRow('9X', 7, 'A', 40.0),
+            PeriodProgressRow('9X', 1, 'A', 50.0),
+        ]
+        skipped = Counter()
+        resolved = resolve_records(records, self.lookups, skipped, {})
+        self.assertEqual(resolved, [(records[0], ('1S', 11, 'A')), (records[2], ('1S', 12, 'B'))])
+        self.assertEqual(skipped, Counter({('grade_level', '9X'): 3, ('periodo', 7): 1}))
+
+    def test_unstorable_values_are_tallied(self):
+        records = [
+            PeriodProgressRow('1S', 1, 'A', float('inf')),
+            PeriodProgressRow('1S', 1, 'B', 30.0),
+            TopicCompletionRow('1S', 1, 'A', 'Retroalimentación', 'Repaso', date(2025, 3, 6)),
+            TopicCompletionRow('1S', 1, 'A', '10', 'Tema', date(2025, 3, 6)),
+        ]
+        skipped = Counter()
+        resolved = resolve_records(records, self.lookups, skipped, {})
+        self.assertEqual([record for record, _ in resolved], [records[1], records[3]])
+        self.assertEqual(skipped, Counter({('progress_percentage', float('inf')): 1, ('tema_number', 'Retroalimentación'): 1}))
+
+    def test_cache_is_shared_between_record_streams(self):
+        resolved_cache = {}
+        resolve_records([PeriodProgressRow('1S', 1, 'A', 10.0)], self.lookups, Counter(), resolved_cache)
+        # A cached key is not looked up again, so stale lookups are not consulted
+        resolved = resolve_records(
+            [TopicCompletionRow('1S', 1, 'A', '', 'Tema', date(2025, 3, 6))], {}, Counter(), resolved_cache,
+        )
+        self.assertEqual(resolved[0][1], ('1S', 11, 'A'))
+
+
+class DropUnchangedTests(ProgressFixtureMixin, TestCase):
+    def unsaved_progress(self, paralelo, percentage):
+        return PeriodProgress(
+            teacher=self.teacher, academic_year=self.year, grade_level=self.grade_1,
+            periodo=self.periodo_1, paralelo=paralelo, progress_percentage=percentage,
+        )
+
+    def unsaved_topic(self, tema_number, title, completion_date):
+        return TopicCompletion(
+            teacher=self.teacher, academic_year=self.year, grade_level=self.grade_1,
+            periodo=self.periodo_1, paralelo=self.paralelo_a,
+            tema_number=tema_number, tema_title=title, completion_date=completion_date,
+        )
+
+    def test_period_progress(self):
+        self.period_progress(paralelo=self.paralelo_a, progress_percentage=50.0)
+        self.period_progress(paralelo=self.paralelo_b, progress_percentage=50.0)
+        # Another teacher's identical row doesn't count as stored for this one
+        self.period_progress(teacher=self.other_teacher, grade_level=self.grade_10, progress_percentage=75.0)
+        identical = self.unsaved_progress(self.paralelo_a, 50.0)
+        changed = self.unsaved_progress(self.paralelo_b, 55.0)
+        new = PeriodProgress(
+            teacher=self.teacher, academic_year=self.year, grade_level=self.grade_10,
+            periodo=self.periodo_1, paralelo=self.paralelo_a, progress_percentage=75.0,
+        )
+        self.assertEqual(
+            drop_unchanged(PeriodProgress, [identical, changed, new], PERIOD_PROGRESS_UNIQUE_FIELDS, PERIOD_PROGRESS_VALUE_FIELDS),
+            [changed, new],
+        )
+
+    def test_topic_completion(self):
+        self.topic_completion(tema_number='1', tema_title='Tema 1', completion_date=date(2025, 3, 6))
+        self.topic_completion(tema_number='2', tema_title='Tema 2', completion_date=date(2025, 3, 13))
+        self.topic_completion(tema_number='3', tema_title='Tema 3', completion_date=date(2025, 3, 20))
+        self.topic_completion(tema_number='', tema_title='Repaso', completion_date=date(2025, 3, 27))
+        objs = [
+            self.unsaved_topic('1', 'Tema 1', date(2025, 3, 6)), # Identical
+            self.unsaved_topic('2', 'Tema 2', date(2025, 3, 14)), # New date
+            self.unsaved_topic('3', 'Tema 3 (corregido)', date(2025, 3, 20)), # New title
+            self.unsaved_topic('', 'Repaso', date(2025, 3, 27)), # Identical, no tema number
+            self.unsaved_topic('4', 'Tema 4', date(2025, 4, 3)), # New
+        ]
+        self.assertEqual(
+            drop_unchanged(TopicCompletion, objs, TOPIC_COMPLETION_UNIQUE_FIELDS, TOPIC_COMPLETION_VALUE_FIELDS),
+            objs[1:3] + objs[4:],
+        )
+
+    def test_empty_tema_number_is_its_own_key(self):
+        self.topic_completion(tema_number='', tema_title='Repaso', completion_date=date(2025, 3, 27))
+        changed = self.unsaved_topic('', 'Repaso', date(2025, 3, 28))
+        self.assertEqual(
+            drop_unchanged(TopicCompletion, [changed], TOPIC_COMPLETION_UNIQUE_FIELDS, TOPIC_COMPLETION_VALUE_FIELDS),
+            [changed],
+        )
+
+    def test_nothing_to_compare(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(drop_unchanged(PeriodProgress, [], PERIOD_PROGRESS_UNIQUE_FIELDS, PERIOD_PROGRESS_VALUE_FIELDS), [])
@@ -1,25 +1,52 @@
 import pygsheets
+import numpy as np
+import pandas as pd
+import math
 import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from itertools import zip_longest
+from dataclasses import dataclass
 from datetime import datetime, date
-from typing import List, Dict, Any, Optional
-from thefuzz import fuzz
+from typing import List, Dict, Any, Optional, Tuple
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+from django.db import connection
+
+from academics.models import AcademicYear, GradeLevel, Periodo, Paralelo
+from .models import PeriodProgress, TopicCompletion
+
+
+# Common titles/prefixes stripped from names (word boundary \b is important).
+# Add more titles to the alternation as needed
+_TITLES_RE = re.compile(
+    r'\b(lic|dr|ing|arq|ms|msc|sr|sra|srta|licenciado|doctor|ingeniero|maestro)\b\.?',
+    re.IGNORECASE,
+)
+_WS_RE = re.compile(r'\s+')
+# thefuzz's force_ascii step: code points 128-255 (ñ, é, ...) are deleted, not folded
+_NON_ASCII_TABLE = {code: None for code in range(128, 256)}
 
 
 def preprocess_name(name: Any) -> str:
     """Cleans and normalizes a name string for comparison."""
     if not isinstance(name, str):
         return "" # Return empty if not a string
+    # Only strings reach the cache, so unhashable values can't break it
+    return _preprocess_name(name)
 
+
+@lru_cache(maxsize=2048)
+def _preprocess_name(name: str) -> str:
+    """preprocess_name for strings; cached, since the same names recur across worksheets and sheets of a sync."""
     processed_name = name.lower() # Convert to lowercase
 
-    # Remove common titles/prefixes using regex (word boundary \b is important)
-    # Add more titles to the list as needed
-    titles_to_remove = [r'\b(lic|dr|ing|arq|ms|msc|sr|sra|srta)\b\.?', r'\b(licenciado|doctor|ingeniero|maestro)\b']
-    for title_pattern in titles_to_remove:
-         processed_name = re.sub(title_pattern, '', processed_name, flags=re.IGNORECASE).strip()
+    # Remove common titles/prefixes (see _TITLES_RE)
+    processed_name = _TITLES_RE.sub('', processed_name)
 
     # Remove extra whitespace (multiple spaces become one)
-    processed_name = re.sub(r'\s+', ' ', processed_name).strip()
+    processed_name = _WS_RE.sub(' ', processed_name).strip()
 
     # Optional: remove punctuation if needed (might remove important hyphens in names?)
     # processed_name = re.sub(r'[^\w\s]', '', processed_name) # Example: removes non-alphanumeric/space
@@ -27,12 +54,29 @@ def preprocess_name(name: Any) -> str:
     return processed_name
 
 
+def fuzz_process(name: str) -> str:
+    """
+    The processor thefuzz's token_set_ratio applied (full_process with
+    force_ascii=True): drops Latin-1 characters, then lowercases and strips
+    punctuation. Kept so name matching accepts the same worksheets it did.
+    """
+    return default_process(name.translate(_NON_ASCII_TABLE))
+
+
+# Authorized clients, per thread and service file. A pygsheets client wraps an
+# httplib2 connection, which must not be shared between threads
+_client_cache = threading.local()
+
+
 # Corrected Type Hint
 def get_pygsheets_client(service_file_path: str) -> pygsheets.client.Client:
     """
     Authorizes access to Google Sheets API using a service account file
     and returns a pygsheets client instance.
 
+    The client is cached for the calling thread, so repeated calls skip the
+    OAuth handshake; its credentials refresh the access token on their own.
+
     Args:
         service_file_path: The file path to the service account JSON key file.
 
@@ -47,8 +91,12 @@ def get_pygsheets_client(service_file_path: str) -> pygsheets.client.Client:
         Exception: For other potential errors during the authorization process
                    from the pygsheets library.
     """
+    clients = _client_cache.__dict__.setdefault('clients', {})
+    if service_file_path in clients:
+        return clients[service_file_path]
     try:
         client = pygsheets.authorize(service_file=service_file_path)
+        clients[service_file_path] = client
         return client
     except FileNotFoundError:
         raise
@@ -58,6 +106,7 @@ def get_pygsheets_client(service_file_path: str) -> pygsheets.client.Client:
         raise
 
 
+@lru_cache(maxsize=256)
 def extract_sheet_key_from_url(url: str) -> Optional[str]:
     """
     Extracts the Google Sheet key from its URL using regular expressions.
@@ -80,8 +129,7 @@ def extract_sheet_key_from_url(url: str) -> Optional[str]:
 
 
 def find_valid_teacher_worksheets(
-    sheet_url: str,
-    service_file_path: str,
+    sh: pygsheets.Spreadsheet,
     header_cell: str = 'E3',
     expected_header_value: str = 'DOCENTE',
     teacher_name_cell: str = 'E4',
@@ -97,9 +145,11 @@ def find_valid_teacher_worksheets(
        spreadsheet's title. Only includes worksheets where the similarity
        score meets or exceeds `similarity_threshold`.
 
+    Both cells of every worksheet are read with a single values.batchGet request.
+
     Args:
-        sheet_url: Full URL of the Google Spreadsheet.
-        service_file_path: Path to the service account JSON file.
+        sh: An already opened pygsheets.Spreadsheet. The caller opens it
+            once and reuses the handle to read the worksheets it returns.
         header_cell: Cell for static header check (default 'E3').
         expected_header_value: Expected header string (default 'DOCENTE').
         teacher_name_cell: Cell with the teacher's name (default 'E4').
@@ -110,25 +160,12 @@ def find_valid_teacher_worksheets(
         A list of titles (strings) of worksheets passing both validation steps.
 
     Raises:
-        ValueError: If sheet key extraction fails.
-        FileNotFoundError: If service file not found.
-        pygsheets.exceptions.AuthenticationError: If authentication fails.
-        pygsheets.SpreadsheetNotFound: If sheet not found or permission denied.
         RuntimeError: For unexpected errors during worksheet processing.
-        ImportError: If 'thefuzz' library is not installed.
+        ImportError: If 'rapidfuzz' library is not installed.
     """
-    sheet_key = extract_sheet_key_from_url(sheet_url)
-    if not sheet_key:
-        raise ValueError(f"Could not extract valid sheet key from URL: {sheet_url}")
-
-    gc = get_pygsheets_client(service_file_path)
-    try:
-        sh = gc.open_by_key(sheet_key)
-    except pygsheets.SpreadsheetNotFound:
-        raise
-
     valid_titles: List[str] = []
     spreadsheet_title = sh.title # Get original title
+    expected_header_norm = expected_header_value.upper()
 
     # --- Extract and clean name part from title ---
     # Assume format NAME_EXTRAINFO or just NAME
@@ -136,19 +173,35 @@ def find_valid_teacher_worksheets(
     name_part_in_title_raw = title_parts[0].strip()
     # Preprocess the extracted title part
     clean_name_title = preprocess_name(name_part_in_title_raw)
+    # The title side is the same for every worksheet, so run the scorer's processor on it once
+    scored_name_title = fuzz_process(clean_name_title)
 
     try:
-        for wks in sh.worksheets():
+        worksheet_titles = [wks.title for wks in sh.worksheets()] # Already loaded by open_by_key
+        # One batchGet for the header and name cells of every worksheet, two ranges per
+        # worksheet in title order, instead of two get_value round-trips per worksheet
+        cell_values = [_first_cell(values) for values in batch_get_values(sh.client, sh.id, [
+            worksheet_range(title, cell)
+            for title in worksheet_titles
+            for cell in (header_cell, teacher_name_cell)
+        ])]
+
+        # Worksheets whose names match exactly, and the rest with their cleaned names, scored together below
+        matched_titles = set()
+        candidate_titles: List[str] = []
+        candidate_names: List[str] = []
+
+        for title, header_cell_value_raw, name_in_cell_raw in zip(
+            worksheet_titles, cell_values[0::2], cell_values[1::2]
+        ):
             # --- Step 1: Header Check (Same as before) ---
-            header_cell_value_raw = wks.get_value(header_cell)
             if not isinstance(header_cell_value_raw, str): continue
             header_cell_value_norm = header_cell_value_raw.strip().upper()
-            if header_cell_value_norm != expected_header_value.upper(): continue
+            if header_cell_value_norm != expected_header_norm: continue
 
-            # --- Step 2: Fuzzy Teacher Name Check ---
-            name_in_cell_raw = wks.get_value(teacher_name_cell)
+            # --- Step 2: Teacher Name, collected for the fuzzy check ---
             if not isinstance(name_in_cell_raw, str) or not name_in_cell_raw.strip():
-                # print(f"DEBUG: Skipping sheet '{wks.title}', name cell {teacher_name_cell} empty or not string.")
+                # print(f"DEBUG: Skipping sheet '{title}', name cell {teacher_name_cell} empty or not string.")
                 continue # Skip if name cell empty/not string
 
             # Preprocess the name found in the cell
@@ -159,27 +212,40 @@ def find_valid_teacher_worksheets(
                 # print(f"WARN: Skipping comparison due to empty cleaned name. Title:'{clean_name_title}', Cell:'{clean_name_cell}'")
                 continue
 
-            # Calculate fuzzy similarity score using token_set_ratio
-            # This handles different word orders and subsets well
-            similarity_score = fuzz.token_set_ratio(clean_name_cell, clean_name_title)
+            scored_name_cell = fuzz_process(clean_name_cell)
+            if scored_name_cell and scored_name_cell == scored_name_title:
+                # Exact match after cleaning, the usual case: no need to score it
+                matched_titles.add(title)
+                continue
+            candidate_titles.append(title)
+            candidate_names.append(scored_name_cell)
+
+        if candidate_names:
+            # Calculate fuzzy similarity scores using token_set_ratio, all candidates in one call.
+            # This handles different word orders and subsets well; with score_cutoff, scores
+            # that can't round up to the threshold stop early and come back as 0
+            similarity_scores = process.cdist(
+                [scored_name_title], candidate_names,
+                scorer=fuzz.token_set_ratio, score_cutoff=max(similarity_threshold - 0.5, 0),
+                dtype=np.float64,
+            )[0]
 
-            # print(f"DEBUG: Comparing '{clean_name_cell}' vs '{clean_name_title}' -> Score: {similarity_score}")
+            # Check if score meets the threshold; thefuzz rounded scores to int
+            # first, so 79.5 still passes a threshold of 80
+            for title, similarity_score in zip(candidate_titles, similarity_scores):
+                if round(similarity_score) >= similarity_threshold:
+                    matched_titles.add(title)
 
-            # Check if score meets the threshold
-            if similarity_score >= similarity_threshold:
-                # print(f"DEBUG: Match found for worksheet '{wks.title}' (Score: {similarity_score} >= {similarity_threshold})")
-                valid_titles.append(wks.title)
-            # else:
-                # Optional: Log low scores for debugging thresholds
-                # print(f"INFO: Name mismatch below threshold for worksheet '{wks.title}'. Score: {similarity_score}")
+        # Worksheet order is kept
+        valid_titles = [title for title in worksheet_titles if title in matched_titles]
 
 
     except ImportError:
-         print("ERROR: The 'thefuzz' library is required for fuzzy matching. Please install it (`pip install thefuzz`).")
+         print("ERROR: The 'rapidfuzz' library is required for fuzzy matching. Please install it (`pip install rapidfuzz`).")
          raise # Re-raise the import error
     except Exception as e:
         # Catch other potential errors during processing
-        raise RuntimeError(f"Error processing worksheets in sheet {sheet_key}") from e
+        raise RuntimeError(f"Error processing worksheets in sheet {sh.id}") from e
 
     return valid_titles
 
@@ -204,107 +270,385 @@ def parse_date(value: Any) -> Optional[datetime.date]:
         return datetime.strptime(cleaned_value, '%d/%m/%y').date()
     except (ValueError, TypeError): return None
 
+def parse_percentages(frame: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized parse_percentage: converts every cell of `frame`, with NaN where it does not parse."""
+    return frame.apply(lambda column: pd.to_numeric(
+        column.astype(str).str.replace(',', '.').str.strip().str.rstrip('%').str.strip(),
+        errors='coerce',
+    ))
+
+def parse_dates(frame: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized parse_date: converts every cell of `frame` to a Timestamp, with NaT where it does not parse."""
+    return frame.apply(lambda column: pd.to_datetime(
+        column.astype(str).str.strip(), format='%d/%m/%y', errors='coerce',
+    ))
+
+@dataclass(slots=True, frozen=True)
+class PeriodProgressRow:
+    """One paralelo's progress % for a period, as read from a worksheet."""
+    grade_level: str
+    periodo: int
+    paralelo: str
+    progress_percentage: float
+
+
+@dataclass(slots=True, frozen=True)
+class TopicCompletionRow:
+    """One paralelo's completion date for a topic, as read from a worksheet."""
+    grade_level: str
+    periodo: int
+    paralelo: str
+    tema_number: str
+    tema_title: str
+    completion_date: date
+
+
+# Data block of every validated worksheet: rows 3..358 of columns A..R. Only the
+# column blocks the parser reads are fetched: A and G (period headers),
+# D and E (tema number and title) and O..R (one column per paralelo)
+WORKSHEET_FIRST_ROW = 3
+WORKSHEET_LAST_ROW = 358
+WORKSHEET_DATA_COLUMNS = (('A', 'A'), ('D', 'G'), ('O', 'R'))
+WORKSHEET_COLUMN_COUNT = 18 # A..R
+# Period header text, e.g. "1ER PERIODO", "2DO PERIODO", "4TO PERIODO" (matched upper-cased)
+_PERIOD_RE = re.compile(r'(\d+)\s*(?:ER|DO|TO)\s+PERIODO')
+# Retries (with exponential backoff) for rate-limited or failed Sheets API reads
+SHEETS_API_RETRIES = 3
+
+
+def worksheet_range(title: str, a1_range: str) -> str:
+    """Builds an A1 range qualified by worksheet title, e.g. "'1S'!A3:R358"."""
+    return "'{}'!{}".format(title.replace("'", "''"), a1_range)
+
+
+def batch_get_values(client: pygsheets.client.Client, spreadsheet_id: str, ranges: List[str]) -> List[List[List[Any]]]:
+    """
+    Reads `ranges` with a single Sheets API values.batchGet request and returns
+    one value matrix per range, in request order ([] for an empty range).
+
+    Goes straight to the googleapiclient service behind the pygsheets client,
+    asking only for each range and its cell values (no cell objects). Values are
+    FORMATTED_VALUE, as shown in the sheet, which is what the parsers expect.
+
+    Callers match the results to `ranges` by position, so a response with a
+    different number of value ranges is an error rather than silently misaligned.
+
+    Raises:
+        googleapiclient.errors.HttpError: If the request fails after retries.
+        ValueError: If the response does not hold one value range per requested range.
+    """
+    request = client.sheet.service.spreadsheets().values().batchGet(
+        spreadsheetId=spreadsheet_id,
+        ranges=ranges,
+        valueRenderOption='FORMATTED_VALUE',
+        # The range echo keeps every entry non-empty, so an empty range is still listed
+        fields='valueRanges(range,values)',
+    )
+    response = request.execute(num_retries=SHEETS_API_RETRIES)
+    value_ranges = response.get('valueRanges', [])
+    if len(value_ranges) != len(ranges):
+        raise ValueError(
+            f"batchGet on sheet {spreadsheet_id} returned {len(value_ranges)} value ranges for {len(ranges)} requested ranges"
+        )
+    # Empty ranges come back without a 'values' key
+    return [value_range.get('values', []) for value_range in value_ranges]
+
+
+def _first_cell(values: List[List[Any]]) -> Any:
+    """Returns the top-left value of a value matrix, or '' like get_value for an empty cell."""
+    return values[0][0] if values and values[0] else ''
+
+
+def worksheet_data_ranges(title: str) -> List[str]:
+    """The A1 ranges fetched from one worksheet, one per block in WORKSHEET_DATA_COLUMNS."""
+    return [
+        worksheet_range(title, f'{first}{WORKSHEET_FIRST_ROW}:{last}{WORKSHEET_LAST_ROW}')
+        for first, last in WORKSHEET_DATA_COLUMNS
+    ]
+
+
+def _value_ranges_to_frame(value_ranges: List[List[List[Any]]]) -> pd.DataFrame:
+    """
+    Assembles the value matrices of `worksheet_data_ranges` into one DataFrame
+    with each column at its sheet position (A=0 ... R=17). Columns that were
+    not fetched are left out; parse_worksheet_frame fills them with ''.
+    """
+    columns = {}
+    for (first, _), values in zip(WORKSHEET_DATA_COLUMNS, value_ranges):
+        block = _values_to_frame(values)
+        offset = ord(first) - ord('A')
+        for position in block.columns:
+            columns[offset + position] = block[position]
+    # Blocks can end on different rows (the API drops trailing empty rows); pad the shorter ones
+    return pd.DataFrame(columns).fillna('')
+
+
+def _values_to_frame(values: List[List[Any]]) -> pd.DataFrame:
+    """Builds a DataFrame from a Sheets value matrix, padding ragged rows with ''."""
+    if not values:
+        return pd.DataFrame()
+    # The API drops trailing empty cells; zip_longest transposes the ragged rows into equal-length columns
+    return pd.DataFrame(dict(enumerate(zip_longest(*values, fillvalue=''))))
+
+
 # Updated extraction function
-def extract_worksheet_data(worksheet: pygsheets.Worksheet) -> Dict[str, List[Dict]]:
+def extract_worksheet_data(worksheet: pygsheets.Worksheet) -> Dict[str, list]:
     """
     Extracts Period Progress and Topic Completion data from a validated worksheet.
     Identifies topic rows based on the presence of a title in Column E.
 
+    Network contract: this issues exactly ONE Sheets API read (a single
+    values.batchGet over the WORKSHEET_DATA_COLUMNS blocks of rows 3..358)
+    and parses the returned values locally. Never
+    add per-cell reads (`get_value`, `cell`) here; each one is a full HTTPS
+    round-trip, and this runs for every worksheet of every teacher. To read
+    several worksheets of one spreadsheet, prefer `extract_worksheets_data`.
+
     Args:
         worksheet: A pygsheets.Worksheet object assumed to have passed validation.
 
     Returns:
         A dictionary containing two lists:
-        'period_progress': List of dicts for PeriodProgress model updates.
-        'topic_completion': List of dicts for TopicCompletion model updates.
+        'period_progress': List of PeriodProgressRow for PeriodProgress model updates.
+        'topic_completion': List of TopicCompletionRow for TopicCompletion model updates.
     """
-    results: Dict[str, List[Dict]] = {'period_progress': [], 'topic_completion': []}
     grade_level = worksheet.title # Assuming worksheet title IS the grade level
 
     try:
-        df = worksheet.get_as_df(start='A3', end='R358',
-                                 header=None,
-                                 include_tailing_empty=False,
-                                 numerize=False,
-                                 empty_value='')
+        # The only network call in this function; the raw value matrices skip pygsheets' DataFrame builder
+        value_ranges = batch_get_values(worksheet.client, worksheet.spreadsheet.id, worksheet_data_ranges(grade_level))
     except Exception as e:
-        print(f"ERROR: Failed to get data as DataFrame from worksheet '{grade_level}': {e}")
-        return results
+        print(f"ERROR: Failed to get data from worksheet '{grade_level}': {e}")
+        return {'period_progress': [], 'topic_completion': []}
+
+    return parse_worksheet_frame(_value_ranges_to_frame(value_ranges), grade_level)
+
+
+def extract_worksheets_data(sh: pygsheets.Spreadsheet, titles: List[str]) -> Dict[str, Dict[str, list]]:
+    """
+    Extracts data from several validated worksheets of one spreadsheet with a
+    single Sheets API values.batchGet request, instead of one read per worksheet.
 
-    current_periodo = 0
-    # Flag to indicate the *next* row should contain period progress %
-    expect_period_progress_next = False
-    paralelos = ['A', 'B', 'C', 'D']
+    Args:
+        sh: An opened pygsheets.Spreadsheet.
+        titles: Titles of the worksheets to read (e.g. from find_valid_teacher_worksheets).
+
+    Returns:
+        A dictionary mapping each title to the same structure returned by
+        `extract_worksheet_data`.
+
+    Raises:
+        googleapiclient.errors.HttpError: If the batch request fails.
+    """
+    ranges = [data_range for title in titles for data_range in worksheet_data_ranges(title)]
+    value_ranges = batch_get_values(sh.client, sh.id, ranges)
+    # Value matrices come back in request order, len(WORKSHEET_DATA_COLUMNS) per worksheet
+    per_worksheet = len(WORKSHEET_DATA_COLUMNS)
+    return {
+        title: parse_worksheet_frame(
+            _value_ranges_to_frame(value_ranges[i * per_worksheet:(i + 1) * per_worksheet]), title
+        )
+        for i, title in enumerate(titles)
+    }
+
+
+def _extract_period(column: pd.Series) -> pd.Series:
+    """Period number (as a string) for each cell of `column` holding a period header, NaN elsewhere."""
+    return column.astype(str).str.strip().str.upper().str.extract(_PERIOD_RE, expand=False)
+
+
+def parse_worksheet_frame(df: pd.DataFrame, grade_level: str) -> Dict[str, list]:
+    """
+    Parses the A3:R358 block of a worksheet (already loaded as a DataFrame
+    with positional columns, A=0; missing columns are treated as empty) into
+    PeriodProgress and TopicCompletion records.
+    """
     paralelo_indices = {'A': 14, 'B': 15, 'C': 16, 'D': 17} # O, P, Q, R
+    paralelos = list(paralelo_indices)
+
+    # Columns missing from the sheet (trailing empties) become '' so every row has A..R
+    df = df.reindex(columns=range(WORKSHEET_COLUMN_COUNT), fill_value='')
+
+    # --- Pass 1: segment the rows by period ---
+    # Column A (index 0) or G (index 6) holds the "PERIODO" text; NaN on other rows
+    header_periods = _extract_period(df[0])
+    # where() rather than fillna(): fillna on these object columns warns about silent downcasting
+    header_periods = header_periods.where(header_periods.notna(), _extract_period(df[6]))
+    is_header = header_periods.notna().to_numpy()
+    # Every row belongs to the period of the last header at or above it (0 before the first one)
+    periods = pd.to_numeric(header_periods).ffill().fillna(0).astype(int).to_numpy()
+    # The row right after a header holds that period's progress %
+    follows_header = np.zeros_like(is_header)
+    follows_header[1:] = is_header[:-1]
+
+    # --- Pass 2: classify the remaining rows and read their paralelo cells (O..R) ---
+    tema_numbers = df[3].astype(str).str.strip().to_numpy() # Column D
+    tema_titles = df[4].astype(str).str.strip().to_numpy() # Column E
+    paralelo_columns = list(paralelo_indices.values())
+    percentages = parse_percentages(df[paralelo_columns]).to_numpy(dtype=float) # NaN if not a %
+    completion_dates = parse_dates(df[paralelo_columns]).apply(lambda column: column.dt.date).to_numpy(dtype=object) # NaT if not a date
+
+    in_period = ~is_header & (periods > 0)
+    is_progress_row = in_period & follows_header
+    # Topic rows are triggered by a title in Column E; spacer and description rows have none
+    is_topic_row = in_period & ~follows_header & (tema_titles != '')
+
+    # (row, paralelo) positions of every parsed cell on those rows, in row-major (sheet) order
+    progress_cells = zip(*np.nonzero(is_progress_row[:, None] & ~np.isnan(percentages)))
+    topic_cells = zip(*np.nonzero(is_topic_row[:, None] & pd.notna(completion_dates)))
+
+    return {
+        'period_progress': [
+            PeriodProgressRow(
+                grade_level=grade_level,
+                periodo=int(periods[row]),
+                paralelo=paralelos[column],
+                progress_percentage=float(percentages[row, column]),
+            )
+            for row, column in progress_cells
+        ],
+        'topic_completion': [
+            TopicCompletionRow(
+                grade_level=grade_level,
+                periodo=int(periods[row]),
+                paralelo=paralelos[column],
+                tema_number=tema_numbers[row], # Store number found (or empty)
+                tema_title=tema_titles[row],
+                completion_date=completion_dates[row, column],
+            )
+            for row, column in topic_cells
+        ],
+    }
+
+
+# Rows per INSERT ... ON CONFLICT / ON DUPLICATE KEY statement
+UPSERT_BATCH_SIZE = 500
+PERIOD_PROGRESS_UNIQUE_FIELDS = ['teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo']
+TOPIC_COMPLETION_UNIQUE_FIELDS = ['teacher', 'academic_year', 'grade_level', 'periodo', 'paralelo', 'tema_number']
+# Fields copied from the sheet; a row is only rewritten when one of these changed,
+# and these (with last_updated) are what the upserts overwrite on an existing row
+PERIOD_PROGRESS_VALUE_FIELDS = ['progress_percentage']
+TOPIC_COMPLETION_VALUE_FIELDS = ['tema_title', 'completion_date']
+
+
+def _bulk_upsert(model, objs, unique_fields: List[str], update_fields: List[str]) -> None:
+    """
+    Inserts `objs` in batches, updating `update_fields` on rows that already
+    exist for the same `unique_fields`. Callers are expected to wrap related
+    upserts in transaction.atomic().
+    """
+    if not objs:
+        return
+    if not connection.features.supports_update_conflicts_with_target:
+        # MySQL resolves conflicts against any unique key and rejects an explicit target
+        unique_fields = None
+    model.objects.bulk_create(
+        objs,
+        batch_size=UPSERT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
 
-    for index, row in df.iterrows():
-        row_values = list(row)
-
-        # --- Check for Period Header ---
-        # Check Column A (index 0) or G (index 6) for "PERIODO" text
-        # Use default '' if index out of bounds (though unlikely with fixed range)
-        cell_a = str(row_values[0]).strip().upper() if len(row_values) > 0 else ''
-        cell_g = str(row_values[6]).strip().upper() if len(row_values) > 6 else ''
-        period_match = re.search(r'(\d+)(?:ER|DO|ER|TO|TO|TO) PERIODO', cell_a + cell_g)
-
-        if period_match:
-            current_periodo = int(period_match.group(1))
-            # Set flag: the row *after* this one should have the progress %
-            expect_period_progress_next = True
-            # print(f"DEBUG: Found Period {current_periodo} at df index {index}. Expecting progress next.")
-            continue # Header row doesn't contain progress or topic data
-
-        # --- Check for Period Progress ---
-        # This check happens *before* the topic check for the same row
-        if expect_period_progress_next:
-            # print(f"DEBUG: Checking for Period {current_periodo} progress at df index {index}")
-            for paralelo, col_idx in paralelo_indices.items():
-                if col_idx < len(row_values):
-                    progress_val = parse_percentage(row_values[col_idx])
-                    if progress_val is not None and current_periodo > 0:
-                        results['period_progress'].append({
-                            'grade_level': grade_level,
-                            'periodo': current_periodo,
-                            'paralelo': paralelo,
-                            'progress_percentage': progress_val,
-                        })
-            # Whether progress was found or not, reset the flag after checking this row
-            expect_period_progress_next = False
-            # Progress row doesn't contain topic data, move to next row
-            continue
 
-        # --- Check for Topic Completion Data (Triggered by Title in Column E)---
-        # Ensure column E (index 4) exists and get title
-        if len(row_values) > 4:
-            tema_title_raw = str(row_values[4]).strip()
-        else:
-            tema_title_raw = '' # Column E doesn't exist on this row
-
-        # Check if Column E has content and we know the current period
-        if tema_title_raw and current_periodo > 0:
-            # We found a topic title, this row likely contains topic data.
-            # Get the Tema Number from Column D (index 3) on the same row.
-            tema_number_raw = str(row_values[3]).strip() if len(row_values) > 3 else ''
-            # print(f"DEBUG: Found Tema Title '{tema_title_raw}' (Num: '{tema_number_raw}') in Period {current_periodo} at df index {index}")
-
-            for paralelo, col_idx in paralelo_indices.items():
-                 if col_idx < len(row_values): # Ensure date column index is valid
-                    completion_date = parse_date(row_values[col_idx])
-                    if completion_date is not None:
-                        results['topic_completion'].append({
-                            'grade_level': grade_level,
-                            'periodo': current_periodo,
-                            'paralelo': paralelo,
-                            'tema_number': tema_number_raw, # Store number found (or empty)
-                            'tema_title': tema_title_raw,
-                            'completion_date': completion_date,
-                        })
-            # This row was processed as topic data, continue to next row
-            continue
+def bulk_upsert_period_progress(objs: List[PeriodProgress]) -> None:
+    """Creates or updates unsaved PeriodProgress instances, a few statements per call instead of one per row."""
+    _bulk_upsert(PeriodProgress, objs, PERIOD_PROGRESS_UNIQUE_FIELDS, PERIOD_PROGRESS_VALUE_FIELDS + ['last_updated'])
 
-        # If none of the above conditions met, it's likely a spacer row or secondary description row.
-        # Reset the period progress flag if it was somehow still set (shouldn't happen with continues).
-        expect_period_progress_next = False
 
+def bulk_upsert_topic_completion(objs: List[TopicCompletion]) -> None:
+    """Creates or updates unsaved TopicCompletion instances, a few statements per call instead of one per row."""
+    _bulk_upsert(TopicCompletion, objs, TOPIC_COMPLETION_UNIQUE_FIELDS, TOPIC_COMPLETION_VALUE_FIELDS + ['last_updated'])
 
-    return results
\ No newline at end of file
+
+def load_lookup_maps(academic_year: AcademicYear) -> Dict[str, Dict[Any, Any]]:
+    """
+    Loads the maps that resolve parsed worksheet rows to foreign keys, one
+    query per table, so rows are resolved with dict hits instead of a
+    `.get()` per row:
+        'grade_levels': GradeLevel code -> pk
+        'periodos': Periodo number -> pk, for `academic_year` only
+        'paralelos': Paralelo code -> pk
+    Only primary keys are loaded (rows are built with *_id), not model instances.
+    GradeLevel and Paralelo use their code as primary key, so those maps are
+    code -> code and each load is a scan of the primary key index.
+    """
+    return {
+        'grade_levels': dict(GradeLevel.objects.values_list('code', 'pk')),
+        'periodos': dict(Periodo.objects.filter(trimestre__academic_year=academic_year).values_list('number', 'pk')),
+        'paralelos': dict(Paralelo.objects.values_list('code', 'pk')),
+    }
+
+
+# Record field -> key in the `lookups` dict built by load_lookup_maps()
+LOOKUP_FIELDS = (('grade_level', 'grade_levels'), ('periodo', 'periodos'), ('paralelo', 'paralelos'))
+TEMA_NUMBER_MAX_LENGTH = TopicCompletion._meta.get_field('tema_number').max_length
+
+
+def unstorable_values(record: Any) -> List[Tuple[str, Any]]:
+    """
+    (field, value) pairs of `record` that its column cannot hold: a tema number
+    longer than TopicCompletion.tema_number, or a percentage that is not finite.
+    Strict MySQL rejects the whole multi-row INSERT for one such value.
+    """
+    progress_percentage = getattr(record, 'progress_percentage', None)
+    tema_number = getattr(record, 'tema_number', None)
+    unstorable = []
+    if progress_percentage is not None and not math.isfinite(progress_percentage):
+        unstorable.append(('progress_percentage', progress_percentage))
+    if tema_number is not None and len(tema_number) > TEMA_NUMBER_MAX_LENGTH:
+        unstorable.append(('tema_number', tema_number))
+    return unstorable
+
+
+def resolve_records(
+    records: List[Any], lookups: Dict[str, Dict[Any, Any]], skipped: Counter, resolved_cache: Dict[tuple, tuple],
+) -> List[Tuple[Any, tuple]]:
+    """
+    Returns (record, (grade_level_id, periodo_id, paralelo_id)) pairs for the records
+    whose values fit their columns and whose lookups all exist. Every unstorable
+    value and every miss is tallied in the `skipped` Counter by (field, value), so
+    one bad cell only loses its own record and typos in the sheet are reported once
+    instead of once per row. `resolved_cache` memoizes each (grade_level, periodo,
+    paralelo) key, so both record streams of a worksheet share one resolution per class.
+    """
+    resolved_records = []
+    for record in records:
+        unstorable = unstorable_values(record)
+        if unstorable:
+            skipped.update(unstorable)
+            continue
+        key = (record.grade_level, record.periodo, record.paralelo)
+        if key not in resolved_cache:
+            missing = [(field, value) for (field, table), value in zip(LOOKUP_FIELDS, key) if value not in lookups[table]]
+            resolved = None if missing else tuple(lookups[table][value] for (field, table), value in zip(LOOKUP_FIELDS, key))
+            resolved_cache[key] = (resolved, missing)
+        resolved, missing = resolved_cache[key]
+        if missing:
+            skipped.update(missing)
+        else:
+            resolved_records.append((record, resolved))
+    return resolved_records
+
+
+def drop_unchanged(model, objs: List[Any], unique_fields: List[str], value_fields: List[str]) -> List[Any]:
+    """
+    Returns the subset of `objs` (all for one teacher and academic year) that is
+    new or differs in `value_fields` from the stored row with the same
+    `unique_fields`. One SELECT per call; in a steady-state run most rows are
+    untouched, so the upsert that follows only writes what actually changed.
+    """
+    if not objs:
+        return objs
+    key_attnames = [model._meta.get_field(field).attname for field in unique_fields]
+    stored = {
+        row[:len(key_attnames)]: row[len(key_attnames):]
+        for row in model.objects.filter(
+            teacher_id=objs[0].teacher_id, academic_year_id=objs[0].academic_year_id
+        ).order_by().values_list(*key_attnames, *value_fields) # No ordering: avoids the joins Meta.ordering adds
+    }
+    return [
+        obj for obj in objs
+        if stored.get(tuple(getattr(obj, attname) for attname in key_attnames))
+        != tuple(getattr(obj, field) for field in value_fields)
+    ]